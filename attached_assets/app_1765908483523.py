@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import os
 
 st.set_page_config(
@@ -21,27 +20,6 @@ st.markdown(
             color: #888;
             margin-bottom: 20px;
         }
-        table.custom-table {
-            width: 100%;
-            border-collapse: collapse;
-            font-family: Arial, sans-serif;
-        }
-        table.custom-table thead {
-            background-color: #2e2e2e;
-            color: white;
-        }
-        table.custom-table th, table.custom-table td {
-            border: 1px solid #444;
-            padding: 10px;
-            text-align: left;
-            vertical-align: top;
-        }
-        table.custom-table tr:nth-child(even) {
-            background-color: #1e1e1e;
-        }
-        table.custom-table tr:nth-child(odd) {
-            background-color: #2a2a2a;
-        }
         a {
             color: #1a73e8;
             text-decoration: none;
@@ -93,13 +71,35 @@ with tab2:
     
     url_button = st.button("Fetch & Analyze", key="search_url")
 
+@st.cache_resource
+def load_engine():
+    from query_functions import get_engine
+    return get_engine()
+
+@st.cache_data(ttl=86400, max_entries=256)
+def cached_extract(url):
+    return load_engine().extract_text_from_url(url)
+
+EXTRACT_PREVIEW_CHARS = 500
+
+@st.fragment
+def show_extracted_text():
+    extracted_text = st.session_state.extracted_text
+    with st.expander("View extracted text"):
+        if len(extracted_text) <= EXTRACT_PREVIEW_CHARS:
+            st.text(extracted_text)
+        elif st.checkbox("Show full text"):
+            st.text(extracted_text)
+        else:
+            st.text(extracted_text[:EXTRACT_PREVIEW_CHARS] + "...")
+
 def display_results(df):
     if df is None or df.empty:
         st.warning("No assessments matched your query. Try rephrasing it!")
         return
     
-    if 'Score' in df.columns:
-        df = df.drop(columns=['Score'])
+    if 'Relevance Score' in df.columns:
+        df = df.drop(columns=['Relevance Score'])
     
     if "Duration" in df.columns:
         df = df.rename(columns={"Duration": "Duration (mins)"})
@@ -108,31 +108,16 @@ def display_results(df):
                     "Remote Testing Support", "Adaptive/IRT", "Duration (mins)", "URL"]
     df = df[[col for col in display_cols if col in df.columns]]
     
-    df['URL'] = df['URL'].apply(
-        lambda x: f"<a href='{x}' target='_blank'>View</a>" if pd.notna(x) else ""
-    )
-    
     st.success(f"Found {len(df)} assessment recommendations:")
     
-    table_html = """
-    <table class="custom-table">
-        <thead>
-            <tr>
-    """
-    
-    for col in df.columns:
-        table_html += f"<th>{col}</th>"
-    table_html += "</tr></thead><tbody>"
-    
-    for _, row in df.iterrows():
-        table_html += "<tr>"
-        for cell in row:
-            table_html += f"<td>{cell}</td>"
-        table_html += "</tr>"
-    
-    table_html += "</tbody></table>"
-    
-    st.markdown(table_html, unsafe_allow_html=True)
+    st.dataframe(
+        df,
+        column_config={
+            "URL": st.column_config.LinkColumn("URL", display_text="View")
+        },
+        hide_index=True,
+        width="stretch"
+    )
     
     st.markdown("---")
     
@@ -144,12 +129,12 @@ def display_results(df):
 if search_button and query.strip():
     with st.spinner("Finding the best assessments for you..."):
         try:
-            from query_functions import query_handling_using_LLM_updated, get_simple_recommendations
+            engine = load_engine()
             
             if use_llm:
-                df = query_handling_using_LLM_updated(query)
+                df = engine.get_llm_recommendations(query)
             else:
-                df = get_simple_recommendations(query, k=num_results)
+                df = engine.get_simple_recommendations(query, top_k=num_results)
             
             display_results(df)
             
@@ -164,22 +149,26 @@ elif search_button:
 if url_button and url_input.strip():
     with st.spinner("Fetching job description from URL..."):
         try:
-            from query_functions import extract_text_from_url, query_handling_using_LLM_updated, get_simple_recommendations
+            engine = load_engine()
             
-            extracted_text = extract_text_from_url(url_input)
+            if st.session_state.get("url") != url_input or "extracted_text" not in st.session_state:
+                st.session_state.extracted_text = cached_extract(url_input)
+                st.session_state.url = url_input
+            extracted_text = st.session_state.extracted_text
             
             if extracted_text.startswith("Error"):
+                cached_extract.clear(url_input)
+                del st.session_state["url"]
                 st.error(f"Failed to fetch URL: {extracted_text}")
             else:
                 st.info("Extracted job description:")
-                with st.expander("View extracted text"):
-                    st.text(extracted_text[:2000] + "..." if len(extracted_text) > 2000 else extracted_text)
+                show_extracted_text()
                 
                 with st.spinner("Analyzing and finding matching assessments..."):
                     if use_llm:
-                        df = query_handling_using_LLM_updated(extracted_text)
+                        df = engine.get_llm_recommendations(extracted_text)
                     else:
-                        df = get_simple_recommendations(extracted_text, k=10)
+                        df = engine.get_simple_recommendations(extracted_text, top_k=10)
                     
                     display_results(df)
                     
@@ -1,4 +1,6 @@
+import asyncio
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import pandas as pd
@@ -8,22 +10,33 @@ import uvicorn
 app = FastAPI(
     title="SHL Assessment Recommendation API",
     description="API for recommending SHL assessments based on job descriptions and queries",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-model = None
-catalog_df = None
-corpus = None
-corpus_embeddings = None
+engine = None
+catalog_fields = None
 
 @app.on_event("startup")
 def startup_event():
-    global model, catalog_df, corpus, corpus_embeddings
+    global engine, catalog_fields
     
     print("Loading models and data...")
     
-    from query_functions import initialize_models
-    catalog_df, corpus, model, corpus_embeddings, _ = initialize_models()
+    from query_functions import get_engine, parse_catalog_fields
+    engine = get_engine()
+    duration_int, test_type_list, skills_list = parse_catalog_fields(engine.catalog)
+    catalog_fields = engine.catalog[["Assessment Name"]].assign(
+        duration_int=duration_int,
+        test_type_list=test_type_list,
+        skills_list=skills_list
+    ).drop_duplicates("Assessment Name").set_index("Assessment Name")
+    
+    print("Warming up query path...")
+    try:
+        engine.get_simple_recommendations("warmup python developer", top_k=1)
+    except Exception as e:
+        print(f"Warmup query failed: {e}")
     
     print("Startup complete!")
 
@@ -59,48 +72,38 @@ def health_check():
     return {"status": "healthy"}
 
 @app.post("/recommend", response_model=RecommendationResponse)
-def recommend_assessments(request: QueryRequest):
+async def recommend_assessments(request: QueryRequest):
     try:
-        from query_functions import query_handling_using_LLM_updated
+        from query_functions import parse_catalog_fields
         
-        df = query_handling_using_LLM_updated(request.query)
+        df = await asyncio.to_thread(engine.get_llm_recommendations, request.query)
         
         if df.empty:
             raise HTTPException(status_code=404, detail="No assessments found.")
         
-        results = []
+        df = df.reindex(columns=[
+            "Assessment Name", "URL", "Adaptive/IRT", "Description",
+            "Duration", "Remote Testing Support", "Test Type", "Skills"
+        ])
+        
+        fields = df[["Assessment Name"]].join(catalog_fields, on="Assessment Name")
+        unmatched = fields["duration_int"].isna()
+        if unmatched.any():
+            duration_int, test_type_list, skills_list = parse_catalog_fields(df[unmatched])
+            fields.loc[unmatched, "duration_int"] = duration_int
+            fields.loc[unmatched, "test_type_list"] = test_type_list
+            fields.loc[unmatched, "skills_list"] = skills_list
         
-        for _, row in df.iterrows():
-            duration_val = row.get("Duration", 30)
-            if isinstance(duration_val, str):
-                import re
-                match = re.search(r'(\d+)', duration_val)
-                duration_val = int(match.group(1)) if match else 30
-            else:
-                duration_val = int(duration_val) if pd.notna(duration_val) else 30
-            
-            test_type = row.get("Test Type", "General")
-            if isinstance(test_type, str):
-                test_type_list = [t.strip() for t in test_type.split(",")]
-            else:
-                test_type_list = [str(test_type)]
-            
-            skills = row.get("Skills", "")
-            if isinstance(skills, str):
-                skills_list = [s.strip() for s in skills.split(",")]
-            else:
-                skills_list = [str(skills)]
-            
-            results.append({
-                "assessment_name": str(row.get("Assessment Name", "")),
-                "url": str(row.get("URL", "")),
-                "adaptive_support": str(row.get("Adaptive/IRT", "No")),
-                "description": str(row.get("Description", "")),
-                "duration": duration_val,
-                "remote_support": str(row.get("Remote Testing Support", "No")),
-                "test_type": test_type_list,
-                "skills": skills_list
-            })
+        results = pd.DataFrame({
+            "assessment_name": df["Assessment Name"].fillna("").astype(str),
+            "url": df["URL"].fillna("").astype(str),
+            "adaptive_support": df["Adaptive/IRT"].fillna("No").astype(str),
+            "description": df["Description"].fillna("").astype(str),
+            "duration": fields["duration_int"].astype(int),
+            "remote_support": df["Remote Testing Support"].fillna("No").astype(str),
+            "test_type": fields["test_type_list"],
+            "skills": fields["skills_list"]
+        }).to_dict(orient="records")
         
         return {"recommended_assessments": results}
     
@@ -110,4 +113,6 @@ def recommend_assessments(request: QueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    reload = os.environ.get("DEV_RELOAD") == "1"
+    workers = 1 if reload else int(os.environ.get("WEB_CONCURRENCY", "1"))
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=reload, workers=workers)
@@ -1,4 +1,6 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from query_functions import get_engine
@@ -6,8 +8,14 @@ from query_functions import get_engine
 app = FastAPI(
     title="SHL Assessment Recommendation API",
     description="AI-powered assessment recommendations for hiring managers",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.on_event("startup")
+def startup_event():
+    get_engine()
 
 class RecommendationRequest(BaseModel):
     query: Optional[str] = None
@@ -37,7 +45,7 @@ def health_check():
     )
 
 @app.post("/recommend")
-def get_recommendations(request: RecommendationRequest):
+async def get_recommendations(request: RecommendationRequest):
     if not request.query and not request.url:
         raise HTTPException(
             status_code=400,
@@ -45,7 +53,7 @@ def get_recommendations(request: RecommendationRequest):
         )
 
     engine = get_engine()
-    results = engine.get_recommendations(
+    results = await engine.get_recommendations_async(
         query=request.query,
         url=request.url,
         max_duration=request.max_duration,
@@ -1,10 +1,20 @@
+import asyncio
+import hashlib
+import ijson
 import os
 import re
+import orjson
+import threading
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
+import httpx
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
+from collections import OrderedDict
+from functools import lru_cache
 
 try:
     from sentence_transformers import SentenceTransformer
@@ -12,27 +22,113 @@ try:
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
 try:
     from google import genai
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
 
+FAISS_THRESHOLD = 10000
+HNSW_THRESHOLD = 50000
+QUERY_CACHE_SIZE = 1024
+LLM_CACHE_SIZE = 256
+GEMINI_MODEL = 'models/gemini-2.0-flash'
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+CATEGORICAL_COLUMNS = ['Test Type', 'Remote Testing Support', 'Adaptive/IRT']
+CODE_FENCE_RE = re.compile(r'^```json?\n?|\n?```$')
+SKILL_RE = re.compile(
+    r'\b(python|java|javascript|sql|react|node\.?js|angular|typescript'
+    r'|problem solving|communication|teamwork|leadership|analytical'
+    r'|data analysis|machine learning|cloud|aws|azure|gcp)\b'
+)
+URL_RE = re.compile(r'(https?://[^\s,]+)')
+DURATION_RE = re.compile(r'(\d+)')
+LIST_SEPARATOR_RE = re.compile(r'\s*,\s*')
+EMBEDDINGS_CACHE_TEMPLATE = 'engine_embeddings_{}.npy'
+EMBEDDINGS_DTYPE = np.float16
+ENCODE_BATCH_SIZE = 128
+URL_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+http_session = requests.Session()
+http_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+)
+http_session.mount('https://', http_adapter)
+http_session.mount('http://', http_adapter)
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return np.array([], dtype=np.intp)
+    candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+def quantize_int8(vectors: np.ndarray):
+    scales = np.abs(vectors).max(axis=-1, keepdims=True).clip(min=1e-12) / 127.0
+    quantized = np.round(vectors / scales).astype(np.int8)
+    return quantized, scales.squeeze(-1).astype(np.float32)
+
+
+def parse_catalog_fields(df: pd.DataFrame):
+    duration_int = pd.to_numeric(
+        df['Duration'].astype(str).str.extract(DURATION_RE, expand=False),
+        errors='coerce'
+    ).fillna(30).astype('int16')
+    test_type_list = df['Test Type'].fillna('General').astype(str).str.strip().str.split(LIST_SEPARATOR_RE, regex=True)
+    skills_list = df['Skills'].fillna('').astype(str).str.strip().str.split(LIST_SEPARATOR_RE, regex=True)
+    return duration_int, test_type_list, skills_list
+
 
 class SHLRecommendationEngine:
-    def __init__(self, catalog_path: str = "SHL_catalog.csv"):
+    def __init__(self, catalog_path: str = "SHL_catalog.csv", quantize_embeddings: bool = False):
         self.catalog = pd.read_csv(catalog_path)
+        self.catalog['Duration'] = pd.to_numeric(self.catalog['Duration'], errors='coerce').fillna(0).astype('int32')
         self.catalog.fillna('', inplace=True)
+        for col in CATEGORICAL_COLUMNS:
+            self.catalog[col] = self.catalog[col].astype('category')
+        self.combined_text = self._build_combined_text()
+        self.combined_text_lower = self.combined_text.str.lower()
+        self.duration_values = self.catalog['Duration'].to_numpy()
+        self.test_type_codes = self.catalog['Test Type'].cat.codes.to_numpy()
+        self.remote_values = (self.catalog['Remote Testing Support'] == 'Yes').to_numpy()
         self.model = None
         self.embeddings = None
+        self.embedding_scales = None
+        self.device_embeddings = None
+        self.index = None
+        self.quantize_embeddings = quantize_embeddings
         self.gemini_client = None
+        self._encode_query = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._encode_query_uncached)
+        self._llm_cache = OrderedDict()
+        self._llm_cache_lock = threading.Lock()
+        self._http_client = None
         self._initialize_model()
         self._initialize_gemini()
         
     def _initialize_model(self):
         if SENTENCE_TRANSFORMERS_AVAILABLE:
             try:
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
+                self.model = SentenceTransformer(EMBEDDING_MODEL)
+                if self.model.device.type == 'cuda':
+                    self.model.half()
                 self._compute_embeddings()
             except Exception as e:
                 print(f"Warning: Could not load sentence transformer: {e}")
@@ -51,37 +147,138 @@ class SHLRecommendationEngine:
     def _compute_embeddings(self):
         if self.model is None:
             return
-        texts = []
-        for _, row in self.catalog.iterrows():
-            text = f"{row['Assessment Name']} {row['Test Type']} {row['Skills']} {row.get('Description', '')}"
-            texts.append(text)
-        self.embeddings = self.model.encode(texts, convert_to_numpy=True)
+        embeddings = self._load_embeddings()
+        if TORCH_AVAILABLE and torch.cuda.is_available() and not self.quantize_embeddings:
+            self.device_embeddings = torch.from_numpy(np.ascontiguousarray(embeddings)).pin_memory().to('cuda', non_blocking=True).half()
+        elif FAISS_AVAILABLE and len(embeddings) > FAISS_THRESHOLD:
+            self.index = self._build_index(embeddings.astype(np.float32))
+        elif self.quantize_embeddings:
+            self.embeddings, self.embedding_scales = quantize_int8(embeddings.astype(np.float32))
+        else:
+            self.embeddings = embeddings
+    
+    def _load_embeddings(self) -> np.ndarray:
+        corpus = self.combined_text.tolist()
+        digest = hashlib.md5('\n'.join([EMBEDDING_MODEL, np.dtype(EMBEDDINGS_DTYPE).name] + corpus).encode('utf-8')).hexdigest()[:16]
+        cache_path = EMBEDDINGS_CACHE_TEMPLATE.format(digest)
+        if os.path.exists(cache_path):
+            try:
+                return np.load(cache_path, mmap_mode='r')
+            except (OSError, ValueError, EOFError) as e:
+                print(f"Warning: Could not load cached embeddings, re-encoding: {e}")
+        embeddings = self.model.encode(
+            corpus,
+            batch_size=ENCODE_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        embeddings = np.ascontiguousarray(embeddings, dtype=EMBEDDINGS_DTYPE)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, embeddings)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Warning: Could not cache embeddings: {e}")
+            return embeddings
+        return np.load(cache_path, mmap_mode='r')
+    
+    def _encode_query_uncached(self, query: str) -> np.ndarray:
+        query_embedding = self.model.encode([query], convert_to_numpy=True)[0].astype(np.float32)
+        query_embedding /= np.linalg.norm(query_embedding) + 1e-12
+        query_embedding.setflags(write=False)
+        return query_embedding
+    
+    def _cached_response(self, prompt: str) -> Optional[Union[str, tuple]]:
+        with self._llm_cache_lock:
+            response = self._llm_cache.get(prompt)
+            if response is not None:
+                self._llm_cache.move_to_end(prompt)
+            return response
+    
+    def _cache_response(self, prompt: str, response: Union[str, tuple]) -> Union[str, tuple]:
+        with self._llm_cache_lock:
+            self._llm_cache[prompt] = response
+            if len(self._llm_cache) > LLM_CACHE_SIZE:
+                self._llm_cache.popitem(last=False)
+            return response
+    
+    def _generate_text(self, prompt: str) -> str:
+        cached = self._cached_response(prompt)
+        if cached is not None:
+            return cached
+        response = self.gemini_client.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=prompt
+        )
+        return self._cache_response(prompt, response.text)
+    
+    async def _generate_text_async(self, prompt: str) -> str:
+        cached = self._cached_response(prompt)
+        if cached is not None:
+            return cached
+        response = await self.gemini_client.aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=prompt
+        )
+        return self._cache_response(prompt, response.text)
+    
+    def _build_index(self, embeddings: np.ndarray):
+        dim = embeddings.shape[1]
+        if len(embeddings) > HNSW_THRESHOLD:
+            index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 200
+        elif self.quantize_embeddings:
+            index = faiss.IndexScalarQuantizer(
+                dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(embeddings)
+        else:
+            index = faiss.IndexFlatIP(dim)
+        index.add(embeddings)
+        return index
     
-    def _get_combined_text(self, row: pd.Series) -> str:
-        return f"{row['Assessment Name']} {row['Test Type']} {row['Skills']} {row.get('Description', '')}"
+    def _build_combined_text(self) -> pd.Series:
+        columns = ['Test Type', 'Skills'] + (['Description'] if 'Description' in self.catalog else [])
+        return self.catalog['Assessment Name'].astype(str).str.cat(
+            [self.catalog[col].astype(str) for col in columns],
+            sep=' ',
+            na_rep=''
+        )
+    
+    def _html_to_text(self, html: str) -> str:
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(['script', 'style', 'header', 'footer', 'nav'])
+        
+        text = ' '.join(tree.text(separator=' ').split())
+        return text[:5000]
     
     def extract_text_from_url(self, url: str) -> str:
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http_session.get(url, headers=URL_HEADERS, timeout=10)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            for tag in soup(['script', 'style', 'header', 'footer', 'nav']):
-                tag.decompose()
-            
-            text = soup.get_text(separator=' ', strip=True)
-            text = re.sub(r'\s+', ' ', text)
-            return text[:5000]
+            return self._html_to_text(response.text)
         except Exception as e:
             return f"Error extracting text: {str(e)}"
     
-    def extract_job_requirements(self, text: str) -> Dict[str, Any]:
-        if self.gemini_client:
-            try:
-                prompt = f"""Analyze this job description and extract the key requirements.
+    async def extract_text_from_url_async(self, url: str) -> str:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                headers=URL_HEADERS,
+                timeout=10,
+                follow_redirects=True,
+                limits=httpx.Limits(max_keepalive_connections=16)
+            )
+        try:
+            response = await self._http_client.get(url)
+            response.raise_for_status()
+            return await asyncio.to_thread(self._html_to_text, response.text)
+        except Exception as e:
+            return f"Error extracting text: {str(e)}"
+    
+    def _job_requirements_prompt(self, text: str) -> str:
+        return f"""Analyze this job description and extract the key requirements.
 Return a JSON object with these fields:
 - skills: list of required technical and soft skills
 - experience_level: junior/mid/senior
@@ -93,32 +290,15 @@ Job Description:
 {text[:3000]}
 
 Return only valid JSON, no markdown formatting."""
-                
-                response = self.gemini_client.models.generate_content(
-                    model='models/gemini-2.0-flash',
-                    contents=prompt
-                )
-                
-                import json
-                result_text = response.text.strip()
-                if result_text.startswith('```'):
-                    result_text = re.sub(r'^```json?\n?', '', result_text)
-                    result_text = re.sub(r'\n?```$', '', result_text)
-                return json.loads(result_text)
-            except Exception as e:
-                print(f"Gemini extraction failed: {e}")
-        
-        skills = []
-        skill_patterns = [
-            r'\b(python|java|javascript|sql|react|node\.?js|angular|typescript)\b',
-            r'\b(problem solving|communication|teamwork|leadership|analytical)\b',
-            r'\b(data analysis|machine learning|cloud|aws|azure|gcp)\b'
-        ]
-        
-        text_lower = text.lower()
-        for pattern in skill_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            skills.extend(matches)
+    
+    def _parse_job_requirements(self, result_text: str) -> Dict[str, Any]:
+        result_text = result_text.strip()
+        if result_text.startswith('```'):
+            result_text = CODE_FENCE_RE.sub('', result_text)
+        return orjson.loads(result_text)
+    
+    def _keyword_job_requirements(self, text: str) -> Dict[str, Any]:
+        skills = SKILL_RE.findall(text.lower())
         
         return {
             'skills': list(set(skills)),
@@ -128,41 +308,67 @@ Return only valid JSON, no markdown formatting."""
             'key_responsibilities': []
         }
     
-    def semantic_search(self, query: str, top_k: int = 10) -> pd.DataFrame:
-        if self.model is None or self.embeddings is None:
-            return self._keyword_search(query, top_k)
-        
-        query_embedding = self.model.encode([query], convert_to_numpy=True)[0]
-        
-        similarities = np.dot(self.embeddings, query_embedding) / (
-            np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding)
-        )
+    def extract_job_requirements(self, text: str) -> Dict[str, Any]:
+        if self.gemini_client:
+            try:
+                return self._parse_job_requirements(self._generate_text(self._job_requirements_prompt(text)))
+            except Exception as e:
+                print(f"Gemini extraction failed: {e}")
+        return self._keyword_job_requirements(text)
+    
+    async def extract_job_requirements_async(self, text: str) -> Dict[str, Any]:
+        if self.gemini_client:
+            try:
+                result_text = await self._generate_text_async(self._job_requirements_prompt(text))
+                return self._parse_job_requirements(result_text)
+            except Exception as e:
+                print(f"Gemini extraction failed: {e}")
+        return self._keyword_job_requirements(text)
+    
+    def search_indices(self, query: str, top_k: int = 10):
+        if self.model is None:
+            return self._keyword_search_indices(query, top_k)
         
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        query_embedding = self._encode_query(' '.join(query.lower().split()))
         
-        results = self.catalog.iloc[top_indices].copy()
-        results['Relevance Score'] = [round(similarities[i] * 100, 1) for i in top_indices]
+        if self.device_embeddings is not None:
+            with torch.inference_mode():
+                query_tensor = torch.tensor(query_embedding, device=self.device_embeddings.device, dtype=self.device_embeddings.dtype)
+                scores, indices = torch.topk((self.device_embeddings @ query_tensor).float(), min(top_k, self.device_embeddings.shape[0]))
+            top_indices, top_scores = indices.cpu().numpy(), scores.cpu().numpy()
+        elif self.index is not None:
+            scores, indices = self.index.search(query_embedding.reshape(1, -1), min(top_k, self.index.ntotal))
+            found = indices[0] >= 0
+            top_indices, top_scores = indices[0][found], scores[0][found]
+        else:
+            if self.embedding_scales is None:
+                similarities = (self.embeddings @ query_embedding.astype(self.embeddings.dtype)).astype(np.float32)
+            else:
+                query_i8, query_scale = quantize_int8(query_embedding)
+                similarities = (self.embeddings @ query_i8.astype(np.int32)) * self.embedding_scales * query_scale
+            top_indices = top_k_indices(similarities, top_k)
+            top_scores = similarities[top_indices]
         
-        return results
+        return top_indices, np.round(top_scores.astype(np.float64) * 100, 1)
     
-    def _keyword_search(self, query: str, top_k: int = 10) -> pd.DataFrame:
+    def _keyword_search_indices(self, query: str, top_k: int = 10):
         query_terms = query.lower().split()
-        scores = []
-        
-        for _, row in self.catalog.iterrows():
-            combined = self._get_combined_text(row).lower()
-            score = sum(1 for term in query_terms if term in combined)
-            scores.append(score)
+        scores = np.zeros(len(self.catalog), dtype=np.int32)
+        for term in query_terms:
+            scores += self.combined_text_lower.str.contains(term, regex=False).to_numpy(dtype=np.int32)
         
-        top_indices = np.argsort(scores)[::-1][:top_k]
-        results = self.catalog.iloc[top_indices].copy()
-        max_score = max(scores) if max(scores) > 0 else 1
-        results['Relevance Score'] = [round((scores[i] / max_score) * 100, 1) for i in top_indices]
-        
-        return results
+        top_indices = top_k_indices(scores, top_k)
+        max_score = max(scores.max(initial=0), 1)
+        return top_indices, np.round(scores[top_indices] / max_score * 100, 1)
+    
+    def _results_frame(self, indices: np.ndarray, scores: np.ndarray) -> pd.DataFrame:
+        return self.catalog.iloc[indices].assign(**{'Relevance Score': scores})
+    
+    def semantic_search(self, query: str, top_k: int = 10) -> pd.DataFrame:
+        return self._results_frame(*self.search_indices(query, top_k))
     
     def filter_by_duration(self, df: pd.DataFrame, max_duration: int) -> pd.DataFrame:
-        return df[df['Duration'].astype(int) <= max_duration]
+        return df[df['Duration'] <= max_duration]
     
     def filter_by_test_type(self, df: pd.DataFrame, test_types: List[str]) -> pd.DataFrame:
         if not test_types:
@@ -174,41 +380,44 @@ Return only valid JSON, no markdown formatting."""
             return df[df['Remote Testing Support'] == 'Yes']
         return df
     
-    def get_recommendations(
+    def _apply_job_requirements(
         self,
-        query: str = None,
-        url: str = None,
+        job_requirements: Dict[str, Any],
+        search_query: Optional[str],
+        test_types: Optional[List[str]]
+    ):
+        if job_requirements.get('skills'):
+            search_query = ' '.join(job_requirements['skills'])
+            if job_requirements.get('test_types') and not test_types:
+                test_types = job_requirements['test_types']
+        return search_query, test_types
+    
+    def _rank_recommendations(
+        self,
+        search_query: Optional[str],
+        job_requirements: Optional[Dict[str, Any]],
         max_duration: int = None,
         test_types: List[str] = None,
         remote_only: bool = False,
         top_k: int = 10
     ) -> Dict[str, Any]:
-        search_query = query
-        job_requirements = None
-        
-        if url:
-            extracted_text = self.extract_text_from_url(url)
-            if not extracted_text.startswith("Error"):
-                job_requirements = self.extract_job_requirements(extracted_text)
-                if job_requirements.get('skills'):
-                    search_query = ' '.join(job_requirements['skills'])
-                    if job_requirements.get('test_types') and not test_types:
-                        test_types = job_requirements['test_types']
-        
         if not search_query:
-            results = self.catalog.head(top_k).copy()
-            results['Relevance Score'] = [100.0] * len(results)
+            indices = np.arange(min(top_k, len(self.catalog)))
+            scores = np.full(len(indices), 100.0)
         else:
-            results = self.semantic_search(search_query, top_k=min(top_k * 2, 50))
+            indices, scores = self.search_indices(search_query, top_k=min(top_k * 2, 50))
         
+        keep = np.ones(len(indices), dtype=bool)
         if max_duration:
-            results = self.filter_by_duration(results, max_duration)
+            keep &= self.duration_values[indices] <= max_duration
         if test_types:
-            results = self.filter_by_test_type(results, test_types)
+            codes = self.catalog['Test Type'].cat.categories.get_indexer(test_types)
+            keep &= np.isin(self.test_type_codes[indices], codes[codes >= 0])
         if remote_only:
-            results = self.filter_by_remote(results, remote_only)
+            keep &= self.remote_values[indices]
         
-        results = results.head(top_k)
+        indices, scores = indices[keep][:top_k], scores[keep][:top_k]
+        results = self._results_frame(indices, scores)
         
         return {
             'recommendations': results.to_dict('records'),
@@ -217,23 +426,200 @@ Return only valid JSON, no markdown formatting."""
             'total_found': len(results)
         }
     
+    def get_recommendations(
+        self,
+        query: str = None,
+        url: str = None,
+        max_duration: int = None,
+        test_types: List[str] = None,
+        remote_only: bool = False,
+        top_k: int = 10
+    ) -> Dict[str, Any]:
+        search_query = query
+        job_requirements = None
+        
+        if url:
+            extracted_text = self.extract_text_from_url(url)
+            if not extracted_text.startswith("Error"):
+                job_requirements = self.extract_job_requirements(extracted_text)
+                search_query, test_types = self._apply_job_requirements(job_requirements, search_query, test_types)
+        
+        return self._rank_recommendations(
+            search_query, job_requirements, max_duration, test_types, remote_only, top_k
+        )
+    
+    async def get_recommendations_async(
+        self,
+        query: str = None,
+        url: str = None,
+        max_duration: int = None,
+        test_types: List[str] = None,
+        remote_only: bool = False,
+        top_k: int = 10
+    ) -> Dict[str, Any]:
+        search_query = query
+        job_requirements = None
+        
+        if url:
+            extracted_text = await self.extract_text_from_url_async(url)
+            if not extracted_text.startswith("Error"):
+                job_requirements = await self.extract_job_requirements_async(extracted_text)
+                search_query, test_types = self._apply_job_requirements(job_requirements, search_query, test_types)
+        
+        return await asyncio.to_thread(
+            self._rank_recommendations,
+            search_query, job_requirements, max_duration, test_types, remote_only, top_k
+        )
+    
+    def _llm_filter_prompt(self, query: str, top_results: str) -> str:
+        return f"""You are an intelligent assistant helping to recommend SHL assessments.
+
+The input below may be:
+1. A natural language query describing assessment needs (e.g., "Need a Python test under 60 minutes").
+2. A job description (JD) pasted directly.
+3. A job description URL (already converted into text outside this function).
+4. A combination of user query + JD.
+
+Step 1: extract and summarize key hiring features from the input. Look for and include the following **if available**:
+
+- Job Title
+- Duration of Test
+- Remote Testing Support (Yes/No)
+- Adaptive/IRT Format (Yes/No)
+- Test Type
+- Skills Required
+- Any other relevant hiring context
+
+Summarize them as a **single line** like this:
+
+`<Job Title> <Duration> <Remote Support> <Adaptive> <Test Type> <Skills> <Other Info>`
+
+Skip any fields not mentioned — do not include placeholders or "N/A".
+
+Step 2: you are given 10 or less assessments retrieved using semantic similarity.
+Go through each assessment and determine if it truly matches the features from step 1, based on the following:
+- Duration match (e.g., if the user wants "< 40 mins", exclude longer ones)
+- Skills match (e.g., user wants "Python" but test is on "Excel", reject it)
+- Remote support, Adaptive format, Test type, or any clearly stated requirement
+- Ignore irrelevant matches, even if score is high
+
+Keep only the assessments that are **highly relevant** to the query.
+Use your understanding of language and hiring to filter smartly. But you have to return something atleast 1 assessment.
+You have to return minimum 1 assessment and maximum 10(only relevant ones). The "filtered" list cannot be empty.
+
+Respond with a single clean JSON object:
+{{
+  "extracted_query": "<single line from step 1>",
+  "filtered": [
+    {{
+      "Assessment Name": "...",
+      "Skills": "...",
+      "Test Type": "...",
+      "Description": "...",
+      "Remote Testing Support": "...",
+      "Adaptive/IRT": "...",
+      "Duration": "... mins",
+      "URL": "...",
+      "Relevance Score": ...
+    }},
+    ...
+  ]
+}}
+
+---
+Input:
+{query}
+
+---
+Assessments:
+{top_results}
+"""
+    
+    def _stream_filtered_assessments(self, prompt: str):
+        events = ijson.sendable_list()
+        parser = ijson.parse_coro(events, use_float=True)
+        builder = None
+        started = False
+        error = None
+        
+        for chunk in self.gemini_client.models.generate_content_stream(model=GEMINI_MODEL, contents=prompt):
+            text = chunk.text or ''
+            if not started:
+                start = text.find('{')
+                if start < 0:
+                    continue
+                text = text[start:]
+                started = True
+            try:
+                parser.send(text.encode('utf-8'))
+            except ijson.JSONError as e:
+                error = e
+            
+            for prefix, event, value in events:
+                if prefix == 'filtered.item' and event == 'start_map':
+                    builder = ijson.ObjectBuilder()
+                if builder is not None:
+                    builder.event(event, value)
+                    if prefix == 'filtered.item' and event == 'end_map':
+                        yield builder.value
+                        builder = None
+                elif prefix == 'filtered' and event == 'end_array':
+                    return
+            del events[:]
+            if error is not None:
+                raise error
+        
+        raise ijson.IncompleteJSONError('LLM response ended before the filtered array was closed')
+    
+    def _filter_with_llm(self, query: str, top_results: List[Dict[str, Any]]) -> Optional[tuple]:
+        if self.gemini_client is None:
+            return None
+        prompt = self._llm_filter_prompt(query, orjson.dumps(top_results, option=orjson.OPT_INDENT_2).decode())
+        cached = self._cached_response(prompt)
+        if cached is not None:
+            return cached
+        try:
+            return self._cache_response(prompt, tuple(self._stream_filtered_assessments(prompt)))
+        except Exception as e:
+            print(f"Error refining assessments: {e}")
+            return None
+    
+    def get_simple_recommendations(self, query: str, top_k: int = 10) -> pd.DataFrame:
+        return self.semantic_search(query, top_k)
+    
+    def get_llm_recommendations(self, query: str, top_k: int = 10) -> pd.DataFrame:
+        match = URL_RE.search(query)
+        if match:
+            extracted_text = self.extract_text_from_url(match.group(1))
+            if not extracted_text.startswith("Error"):
+                query += " " + extracted_text
+        
+        top_results = self.semantic_search(query, top_k).to_dict('records')
+        filtered = self._filter_with_llm(query, top_results)
+        return pd.DataFrame(list(filtered or top_results))
+    
     def get_test_types(self) -> List[str]:
-        return sorted(self.catalog['Test Type'].unique().tolist())
+        return sorted(self.catalog['Test Type'].cat.categories.tolist())
     
     def get_catalog_stats(self) -> Dict[str, Any]:
         return {
             'total_assessments': len(self.catalog),
             'test_types': self.catalog['Test Type'].value_counts().to_dict(),
-            'avg_duration': round(self.catalog['Duration'].astype(int).mean(), 1),
-            'remote_supported': (self.catalog['Remote Testing Support'] == 'Yes').sum(),
-            'adaptive_tests': (self.catalog['Adaptive/IRT'] == 'Yes').sum()
+            'avg_duration': round(float(self.catalog['Duration'].mean()), 1),
+            'remote_supported': int((self.catalog['Remote Testing Support'] == 'Yes').sum()),
+            'adaptive_tests': int((self.catalog['Adaptive/IRT'] == 'Yes').sum())
         }
 
 
 engine = None
+engine_lock = threading.Lock()
 
 def get_engine() -> SHLRecommendationEngine:
     global engine
     if engine is None:
-        engine = SHLRecommendationEngine()
+        with engine_lock:
+            if engine is None:
+                engine = SHLRecommendationEngine(
+                    quantize_embeddings=os.environ.get('SHL_QUANTIZE_EMBEDDINGS') == '1'
+                )
     return engine
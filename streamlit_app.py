@@ -1,10 +1,14 @@
 # streamlit_app.py
 import streamlit as st
 import requests
-import pandas as pd
-import plotly.express as px
-from bs4 import BeautifulSoup
-from typing import List
+from requests.adapters import HTTPAdapter
+import orjson
+from typing import List, TYPE_CHECKING
+
+# pandas, plotly and lxml are imported where they are first needed so that a
+# cold start that never runs a search does not pay for them
+if TYPE_CHECKING:
+    import pandas as pd
 
 API_URL = "http://localhost:8000/recommend"
 
@@ -24,29 +28,140 @@ def strip_html(s: str) -> str:
     # If the incoming value is not a string, cast to str
     if not isinstance(s, str):
         s = str(s)
-    return BeautifulSoup(s, "lxml").get_text(separator=" ", strip=True)
-
-def normalize_recs(raw_recs: List[dict]) -> List[dict]:
-    """Return sanitized, normalized records for display and charting."""
-    norm = []
-    for r in raw_recs:
-        rec = {
-            "Assessment Name": strip_html(r.get("Assessment Name", "Untitled")),
-            "URL": r.get("URL", "#"),
-            "Duration": r.get("Duration", None) if r.get("Duration") is not None else None,
-            "Remote Testing Support": strip_html(r.get("Remote Testing Support", "No")),
-            "Adaptive/IRT": strip_html(r.get("Adaptive/IRT", "No")),
-            "Test Type": strip_html(r.get("Test Type", "Other")),
-            "Skills": strip_html(r.get("Skills", "")),
-            "Description": strip_html(r.get("Description", "")),
-            "Relevance Score": float(r.get("Relevance Score", 0.0)) if r.get("Relevance Score") is not None else 0.0,
-        }
-        norm.append(rec)
-    return norm
+    # Plain text (the common case) needs no parser at all
+    if "<" not in s and "&" not in s:
+        return s.strip()
+    if not s.strip():
+        return ""
+    from lxml import etree, html as lxml_html
+    try:
+        doc = lxml_html.document_fromstring(s)
+    except etree.ParserError:
+        # Comment- or processing-instruction-only input has no text to show
+        return ""
+    for el in doc.xpath("//script|//style"):
+        el.drop_tree()
+    return " ".join(" ".join(doc.itertext()).split())
+
+RECORD_DEFAULTS = {
+    "Assessment Name": "Untitled",
+    "URL": "#",
+    "Duration": None,
+    "Remote Testing Support": "No",
+    "Adaptive/IRT": "No",
+    "Test Type": "Other",
+    "Skills": "",
+    "Description": "",
+    "Relevance Score": 0.0,
+}
+TEXT_COLUMNS = ["Assessment Name", "Remote Testing Support", "Adaptive/IRT", "Test Type", "Skills", "Description"]
+CATEGORY_COLUMNS = ["Remote Testing Support", "Adaptive/IRT", "Test Type"]
+
+def normalize_recs(raw_recs: List[dict]) -> "pd.DataFrame":
+    """Return a sanitized, normalized frame for display and charting."""
+    import pandas as pd
+
+    df = pd.DataFrame(raw_recs).reindex(columns=list(RECORD_DEFAULTS))
+    # Missing keys and nulls fall back to the display defaults (Duration stays empty)
+    df = df.fillna({col: default for col, default in RECORD_DEFAULTS.items() if default is not None})
+    for col in TEXT_COLUMNS:
+        values = df[col].astype(str)
+        # Only columns that actually carry markup or entities go through the parser
+        if values.str.contains("<|&", regex=True).any():
+            df[col] = values.map(strip_html)
+        else:
+            df[col] = values.str.strip()
+    df[CATEGORY_COLUMNS] = df[CATEGORY_COLUMNS].astype("category")
+    df["is_remote"] = df["Remote Testing Support"].str.lower().eq("yes")
+    df["Relevance Score"] = pd.to_numeric(df["Relevance Score"], errors="coerce").fillna(0.0)
+    return df
+
+def format_duration(dur) -> str:
+    """Card label for a duration; whole minutes show without the float upcast's '.0'."""
+    import pandas as pd
+
+    if pd.isna(dur):
+        return "N/A"
+    if isinstance(dur, float) and dur.is_integer():
+        return str(int(dur))
+    return str(dur)
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled keep-alive session to the backend, shared across reruns and users."""
+    session = requests.Session()
+    session.headers["Content-Type"] = "application/json"
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_and_normalize(query: str, top_k: int, max_duration: int, remote_only: bool):
+    """Call the backend and return (normalized records, total_found); cached per payload."""
+    payload = {
+        "query": query,
+        "top_k": top_k,
+        "max_duration": max_duration,
+        "remote_only": remote_only,
+    }
+    resp = get_session().post(API_URL, data=orjson.dumps(payload), timeout=25)
+    resp.raise_for_status()
+    data = orjson.loads(resp.content)
+    recs = normalize_recs(data.get("recommendations", []))
+    return recs, data.get("total_found", len(recs))
+
+@st.cache_data(show_spinner=False)
+def build_type_pie(type_counts: tuple):
+    """Donut chart of test types from pre-aggregated (label, count) pairs."""
+    import plotly.graph_objects as go
+
+    labels, values = zip(*type_counts)
+    fig = go.Figure(go.Pie(labels=labels, values=values, hole=0.45))
+    fig.update_layout(title="Assessment Types Distribution", template="plotly_dark")
+    return fig
+
+@st.cache_data(show_spinner=False)
+def build_duration_histogram(durations: tuple, bins: int = 6):
+    """Duration histogram binned with numpy and drawn as a plain bar chart."""
+    import numpy as np
+    import plotly.graph_objects as go
+
+    counts, edges = np.histogram(durations, bins=bins)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(
+        title="Duration Histogram (minutes)",
+        xaxis_title="Duration (min)",
+        yaxis_title="count",
+        template="plotly_dark",
+        bargap=0,
+    )
+    return fig
+
+CARD_COLUMNS = ["Assessment Name", "URL", "Duration", "is_remote", "Test Type", "Skills", "Description", "Relevance Score"]
+
+# Result card markup, bound once; the render loop only fills in the fields
+CARD_TEMPLATE = """
+<div class="card">
+    <h3 style="margin:0 0 8px 0; color:#dbe9ff;">{name}</h3>
+    <div style="margin-bottom:8px;">
+        <span class="badge badge-type">{tt}</span>
+        <span class="badge badge-time">⏱ {dur} min</span>
+        <span class="badge badge-mode">{mode}</span>
+    </div>
+    <div style="margin-top:6px;">
+        <p style="margin:6px 0;"><strong>Skills:</strong> {skills}</p>
+        <p style="margin:6px 0; color:var(--muted,#9fb0d3);">{desc}</p>
+    </div>
+    <div class="row-actions">
+        <div class="score">Score: {score:.1f}%</div>
+        <div><a class="view-btn" href="{url}" target="_blank" rel="noopener noreferrer">View Assessment</a></div>
+    </div>
+</div>
+""".format_map
 
 # ---------------- STYLES ----------------
-st.markdown(
-    """
+CSS = """
 <style>
 /* Page background */
 .stApp {
@@ -143,20 +258,17 @@ st.markdown(
 /* Footer text color */
 .footer { color:#9fb0d3; font-size:0.9rem; margin-top:18px; text-align:center; }
 </style>
-""",
-    unsafe_allow_html=True,
-)
+"""
 
 # ---------------- HEADER ----------------
-st.markdown(
-    """
+HEADER_HTML = """
 <div class="header">
     <h1>🎯 SHL Assessment Finder</h1>
     <p>AI-powered assessment recommendations for hiring managers</p>
 </div>
-""",
-    unsafe_allow_html=True,
-)
+"""
+# Styles and header are static: emit them together as a single element
+st.markdown(CSS + HEADER_HTML, unsafe_allow_html=True)
 
 # ---------------- SIDEBAR ----------------
 with st.sidebar:
@@ -175,126 +287,90 @@ def show_skeleton(count: int = 3):
         st.markdown('<div class="skeleton"></div>', unsafe_allow_html=True)
 
 # ---------------- SEARCH LOGIC ----------------
-if search:
+# Results persist in session state so that widget changes after a search
+# re-filter them instead of wiping the page; the backend is only called again
+# on a click or when the backend-side inputs change.
+search_key = (query, top_k, max_duration, remote_only)
+if search or st.session_state.get("search_key", search_key) != search_key:
     with st.spinner("🔎 Analyzing requirements and fetching recommendations..."):
         # show improved dark skeleton
         show_skeleton(3)
         try:
-            payload = {
-                "query": query,
-                "top_k": top_k,
-                "max_duration": max_duration,
-                "remote_only": remote_only,
-            }
-            resp = requests.post(API_URL, json=payload, timeout=25)
+            st.session_state.search_results = fetch_and_normalize(query, top_k, max_duration, remote_only)
+            st.session_state.search_key = search_key
         except requests.exceptions.ConnectionError:
             st.error("❌ Cannot connect to backend. Make sure FastAPI is running at http://localhost:8000")
             st.stop()
+        except requests.exceptions.HTTPError as e:
+            st.error(f"Backend returned error {e.response.status_code}: {e.response.text}")
+            st.stop()
         except Exception as e:
             st.error(f"Unexpected error while calling backend: {e}")
             st.stop()
 
-    if resp.status_code != 200:
-        st.error(f"Backend returned error {resp.status_code}: {resp.text}")
-        st.stop()
-
-    # normalize and sanitize
-    data = resp.json()
-    raw_recs = data.get("recommendations", [])
-    recs = normalize_recs(raw_recs)
-
-    # client-side filters (duration, min score, remote)
-    filtered = []
-    for r in recs:
-        # duration filter
-        dur = r.get("Duration")
-        if dur is not None and isinstance(dur, (int, float)):
-            if dur > max_duration:
-                continue
-        # min score filter
-        if r.get("Relevance Score", 0.0) < float(min_score):
-            continue
-        # remote only filter
-        if remote_only and r.get("Remote Testing Support", "").lower() != "yes":
-            continue
-        filtered.append(r)
-
-    total_found = data.get("total_found", len(recs))
+results = st.session_state.get("search_results")
+if results is not None:
+    import pandas as pd
+
+    recs, total_found = results
+
+    # client-side filters (duration, min score, remote) as one boolean mask;
+    # non-numeric durations are kept, as before
+    durations = pd.to_numeric(recs["Duration"], errors="coerce")
+    mask = (durations.isna() | (durations <= max_duration)) & (recs["Relevance Score"] >= float(min_score))
+    if remote_only:
+        mask &= recs["is_remote"]
+    filtered = recs[mask]
+
     st.success(f"Found {len(filtered)} matched assessments (total catalog matches: {total_found})")
 
     # ---------------- CARDS ----------------
-    for r in filtered:
-        # build the card as HTML but with sanitized values (no raw HTML inserted)
-        name = r["Assessment Name"]
-        tt = r["Test Type"]
-        dur = r["Duration"] if r["Duration"] is not None else "N/A"
-        mode = "Remote" if r["Remote Testing Support"].lower() == "yes" else "On-site"
-        skills = r["Skills"] or "—"
-        desc = r["Description"] or ""
-        score = r["Relevance Score"]
-        url = r["URL"] or "#"
-
-        card_html = f"""
-        <div class="card">
-            <h3 style="margin:0 0 8px 0; color:#dbe9ff;">{name}</h3>
-            <div style="margin-bottom:8px;">
-                <span class="badge badge-type">{tt}</span>
-                <span class="badge badge-time">⏱ {dur} min</span>
-                <span class="badge badge-mode">{mode}</span>
-            </div>
-            <div style="margin-top:6px;">
-                <p style="margin:6px 0;"><strong>Skills:</strong> {skills}</p>
-                <p style="margin:6px 0; color:var(--muted,#9fb0d3);">{desc}</p>
-            </div>
-            <div class="row-actions">
-                <div class="score">Score: {score:.1f}%</div>
-                <div><a class="view-btn" href="{url}" target="_blank" rel="noopener noreferrer">View Assessment</a></div>
-            </div>
-        </div>
-        """
-        st.markdown(card_html, unsafe_allow_html=True)
+    # all cards go out as one markdown element instead of one per result
+    cards_html = []
+    for name, url, dur, remote, tt, skills, desc, score in filtered[CARD_COLUMNS].itertuples(index=False, name=None):
+        # fill the card with sanitized values (no raw HTML inserted)
+        cards_html.append(CARD_TEMPLATE({
+            "name": name,
+            "tt": tt,
+            "dur": format_duration(dur),
+            "mode": "Remote" if remote else "On-site",
+            "skills": skills or "—",
+            "desc": desc or "",
+            "score": score,
+            "url": url or "#",
+        }))
+    if cards_html:
+        st.markdown("".join(cards_html), unsafe_allow_html=True)
 
     # ---------------- CHARTS ----------------
     if len(filtered) > 0:
-        df = pd.DataFrame(filtered)
+        df = filtered
 
         st.markdown('<div class="section-title"><b>📊 Insights</b></div>', unsafe_allow_html=True)
         col1, col2 = st.columns([1, 1])
 
         with col1:
-            # Pie chart for test-type distribution
-            fig1 = px.pie(
-                df,
-                names="Test Type",
-                title="Assessment Types Distribution",
-                template="plotly_dark",
-                hole=0.45,
-            )
+            # Pie chart for test-type distribution, built from counts so the
+            # cached figure is reused whenever the distribution is unchanged
+            type_counts = df["Test Type"].value_counts()
+            type_counts = tuple(type_counts[type_counts > 0].items())
             # updated plotting call (no use_container_width)
-            st.plotly_chart(fig1, width="stretch", use_container_width=False)
+            st.plotly_chart(build_type_pie(type_counts), width="stretch", use_container_width=False)
 
         with col2:
-            # Duration histogram
-            # ensure Duration is numeric
-            dur_series = pd.to_numeric(df["Duration"], errors="coerce").dropna()
+            # Duration histogram, reusing the numeric durations from the filter step
+            dur_series = durations[mask].dropna()
             if dur_series.empty:
                 st.info("No duration data for insights.")
             else:
-                hist = px.histogram(
-                    dur_series,
-                    nbins=6,
-                    title="Duration Histogram (minutes)",
-                    labels={"value": "Duration (min)"},
-                    template="plotly_dark",
-                )
+                hist = build_duration_histogram(tuple(dur_series.tolist()))
                 st.plotly_chart(hist, width="stretch", use_container_width=False)
 
     else:
         st.info("No results after applying filters. Try widening filters or lowering the minimum relevance score.")
 
 # ---------------- FOOTER ----------------
-st.markdown(
-    """
+FOOTER_HTML = """
 <div class="footer">
     SHL Assessment Finder • By Shubam Kumar • © 2025<br>
      <a href="https://github.com/shubamkumar" target="_blank" rel="noopener noreferrer" style="margin-right:12px; text-decoration:none; color:inherit;">
@@ -307,6 +383,5 @@ st.markdown(
         <img src="https://cdn-icons-png.flaticon.com/512/732/732200.png" width="20" style="vertical-align:middle; margin-right:6px;">Email
     </a>
 </div>
-""",
-    unsafe_allow_html=True,
-)
+"""
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)